@@ -0,0 +1,150 @@
+// チャート描画 (データは historyPoints / currentPoints / segColors として埋め込まれる)
+// 各点は [x, y] の配列
+document.addEventListener("DOMContentLoaded", function() {
+    var canvas = document.getElementById('sectorCycleChart');
+    var ctx = canvas.getContext('2d');
+
+    // 座標軸の範囲とグリッド線の間隔
+    var AXIS_MIN = -25;
+    var AXIS_MAX = 25;
+    var GRID_STEP = 5;
+
+    // 四隅に表示するセクターリスト
+    const sectorLabels = {
+        NW: ["電機・精密", "情報通信", "建設・資材"],
+        NE: ["自動車", "機械", "商社・卸売"],
+        SE: ["銀行", "金融(除)", "エネルギー"],
+        SW: ["医薬品", "食品", "小売"]
+    };
+
+    // 背景 (四象限の色分け・十字線・エリア名・業種名)
+    function drawBackground(ca, midX, midY) {
+        ctx.save();
+        
+        // --- 背景色の描画 ---
+        // 北西 (回復): 芽吹き、若草色/シアン系
+        ctx.fillStyle = 'rgba(225, 250, 240, 0.5)';
+        ctx.fillRect(ca.left, ca.top, midX - ca.left, midY - ca.top);
+        
+        // 北東 (好況): 過熱、赤/オレンジ系
+        ctx.fillStyle = 'rgba(255, 235, 235, 0.5)';
+        ctx.fillRect(midX, ca.top, ca.left + ca.width - midX, midY - ca.top);
+        
+        // 南東 (後退): 警戒、黄色/アンバー系
+        ctx.fillStyle = 'rgba(255, 252, 230, 0.5)';
+        ctx.fillRect(midX, midY, ca.left + ca.width - midX, ca.top + ca.height - midY);
+        
+        // 南西 (不況): 冷え込み、青紫/グレー系
+        ctx.fillStyle = 'rgba(235, 235, 250, 0.5)';
+        ctx.fillRect(ca.left, midY, midX - ca.left, ca.top + ca.height - midY);
+        
+        // --- 十字線の描画 (少し濃く) ---
+        ctx.strokeStyle = 'rgba(0,0,0,0.2)';
+        ctx.lineWidth = 1;
+        ctx.beginPath();
+        ctx.moveTo(midX, ca.top); ctx.lineTo(midX, ca.bottom);
+        ctx.moveTo(ca.left, midY); ctx.lineTo(ca.right, midY);
+        ctx.stroke();
+
+        // --- テキスト描画設定 ---
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        
+        // エリア名 (中央寄り)
+        ctx.font = 'bold 16px sans-serif';
+        ctx.fillStyle = 'rgba(0,0,0,0.4)';
+        ctx.fillText('回復期', (ca.left + midX)/2, (ca.top + midY)/2);
+        ctx.fillText('好況期', (midX + ca.right)/2, (ca.top + midY)/2);
+        ctx.fillText('後退期', (midX + ca.right)/2, (midY + ca.bottom)/2);
+        ctx.fillText('不況期', (ca.left + midX)/2, (midY + ca.bottom)/2);
+
+        // --- 四隅の業種名描画 ---
+        ctx.font = '10px sans-serif';
+        ctx.fillStyle = 'rgba(0,0,0,0.5)';
+        var pad = 10;
+        var lineHeight = 12;
+
+        // NW (左上)
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'top';
+        sectorLabels.NW.forEach((text, i) => {
+            ctx.fillText(text, ca.left + pad, ca.top + pad + (i * lineHeight));
+        });
+
+        // NE (右上)
+        ctx.textAlign = 'right';
+        sectorLabels.NE.forEach((text, i) => {
+            ctx.fillText(text, ca.right - pad, ca.top + pad + (i * lineHeight));
+        });
+
+        // SE (右下)
+        ctx.textAlign = 'right';
+        ctx.textBaseline = 'bottom';
+        sectorLabels.SE.slice().reverse().forEach((text, i) => {
+            ctx.fillText(text, ca.right - pad, ca.bottom - pad - (i * lineHeight));
+        });
+
+        // SW (左下)
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'bottom';
+        sectorLabels.SW.slice().reverse().forEach((text, i) => {
+            ctx.fillText(text, ca.left + pad, ca.bottom - pad - (i * lineHeight));
+        });
+
+        ctx.restore();
+    }
+
+    function draw() {
+        // 表示サイズに合わせて描画解像度を決める (高DPI端末でもぼやけないように)
+        var dpr = window.devicePixelRatio || 1;
+        var rect = canvas.getBoundingClientRect();
+        canvas.width = Math.round(rect.width * dpr);
+        canvas.height = Math.round(rect.height * dpr);
+        ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+        ctx.clearRect(0, 0, rect.width, rect.height);
+
+        var ca = {left: 0, top: 0, right: rect.width, bottom: rect.height, width: rect.width, height: rect.height};
+        var toX = function(v) {
+            return ca.left + (v - AXIS_MIN) / (AXIS_MAX - AXIS_MIN) * ca.width;
+        };
+        var toY = function(v) {
+            return ca.bottom - (v - AXIS_MIN) / (AXIS_MAX - AXIS_MIN) * ca.height;
+        };
+
+        drawBackground(ca, toX(0), toY(0));
+
+        // --- グリッド線 (薄いグレー) ---
+        ctx.strokeStyle = 'rgba(0, 0, 0, 0.05)';
+        ctx.lineWidth = 1;
+        ctx.beginPath();
+        for (var v = AXIS_MIN; v <= AXIS_MAX; v += GRID_STEP) {
+            ctx.moveTo(toX(v), ca.top); ctx.lineTo(toX(v), ca.bottom);
+            ctx.moveTo(ca.left, toY(v)); ctx.lineTo(ca.right, toY(v));
+        }
+        ctx.stroke();
+
+        // --- 軌跡 (色は Python 側で計算済み。古いほど薄い) ---
+        ctx.lineWidth = 2;
+        for (var i = 1; i < historyPoints.length; i++) {
+            ctx.strokeStyle = segColors[i];
+            ctx.beginPath();
+            ctx.moveTo(toX(historyPoints[i - 1][0]), toY(historyPoints[i - 1][1]));
+            ctx.lineTo(toX(historyPoints[i][0]), toY(historyPoints[i][1]));
+            ctx.stroke();
+        }
+
+        // --- 現在地点 ---
+        currentPoints.forEach(function(p) {
+            ctx.beginPath();
+            ctx.arc(toX(p[0]), toY(p[1]), 8, 0, Math.PI * 2);
+            ctx.fillStyle = 'rgba(255, 0, 0, 1)';
+            ctx.fill();
+            ctx.lineWidth = 2;
+            ctx.strokeStyle = '#fff';
+            ctx.stroke();
+        });
+    }
+
+    draw();
+    window.addEventListener('resize', draw);
+});
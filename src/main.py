@@ -1,24 +1,49 @@
 import os
 import json
+import hashlib
+import re
+import tempfile
 import sys
-import math
-from datetime import datetime, timedelta
-import yfinance as yf
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 import pandas as pd
 import numpy as np
-import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import rjsmin
+    import rcssmin
+except ImportError:
+    rjsmin = rcssmin = None
 
 # ==========================================
 # 1. 設定と定数定義
 # ==========================================
 
+def dumps_json(obj):
+    """空白なしのJSON文字列に変換する (orjson があれば使う)。"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+def loads_json(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
 def load_secrets():
     secrets_json = os.environ.get('WP_SECRETS_JSON')
     if not secrets_json:
         print("Error: WP_SECRETS_JSON environment variable is not set.")
         sys.exit(1)
     try:
-        config = json.loads(secrets_json)
+        config = loads_json(secrets_json)
         if "GITHUB_PAGES_URL" in config and not config["GITHUB_PAGES_URL"].endswith("/"):
             config["GITHUB_PAGES_URL"] += "/"
         return config
@@ -26,6 +51,29 @@ def load_secrets():
         print("Error: Failed to parse WP_SECRETS_JSON.")
         sys.exit(1)
 
+@lru_cache(maxsize=None)
+def get_session():
+    """
+    HTTP通信用のセッション。接続を使い回し、5xx は指数バックオフで再試行する。
+    (WordPress のページ更新は同じ内容の上書きなので POST も再試行してよい)
+    requests は import が重いため、初めて通信する時点で読み込む。
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET", "POST"],
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4, pool_maxsize=FETCH_WORKERS, max_retries=retry,
+    ))
+    return session
+
 # セクター定義
 SECTORS = [
     {"code": "1625.T", "name": "電機・精密", "clock": 10.5, "area": "NW"},
@@ -42,6 +90,10 @@ SECTORS = [
     {"code": "1630.T", "name": "小売",        "clock": 8.5,  "area": "SW"},
 ]
 
+# 計算では列単位でしか参照しないため、項目ごとの配列に展開しておく
+_SECTOR_CODES = [s["code"] for s in SECTORS]
+_SECTOR_CLOCKS = np.array([s["clock"] for s in SECTORS], dtype=np.float64)
+
 PHASES = {
     "回復期": {"x_sign": -1, "y_sign": 1},
     "好況期": {"x_sign": 1,  "y_sign": 1},
@@ -49,6 +101,27 @@ PHASES = {
     "不況期": {"x_sign": -1, "y_sign": -1},
 }
 
+# 符号ビット 2*(y>=0) + (x>=0) で引けるフェーズ名の表
+_PHASE_TABLE = tuple(
+    name for _, name in sorted(
+        (2 * (signs["y_sign"] > 0) + (signs["x_sign"] > 0), name)
+        for name, signs in PHASES.items()
+    )
+)
+
+# 株価取得 (Yahoo Finance chart API)
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0"}
+# (接続, 読み込み) のタイムアウト秒数。応答が無いまま止まり続けるのを防ぐ
+HTTP_TIMEOUT = (5, 30)
+FETCH_WORKERS = 8
+
+# 取得済み株価のキャッシュ (GitHub Actions の actions/cache で実行間に引き継ぐ)
+CACHE_PATH = os.path.join("cache", "prices.parquet")
+CACHE_OVERLAP_DAYS = 7
+# 前回 WordPress に反映したチャートのハッシュ (同じ内容なら更新を省略する)
+CHART_HASH_PATH = os.path.join("cache", "chart.hash")
+
 # 除外セクターの説明用HTML (テーブルデザイン)
 EXCLUSION_HTML = """
 <table style="width:100%; border-collapse: collapse; font-size: 0.9em; margin-top: 10px;">
@@ -83,259 +156,205 @@ EXCLUSION_HTML = """
 # 2. 計算ロジック
 # ==========================================
 
+def fetch_close(session, ticker, start=None):
+    """
+    1銘柄分の日足終値 (調整後) を取得する。
+    start を省略した場合は過去2年分、指定した場合はその日以降を取得する。
+    """
+    url = YAHOO_CHART_URL.format(ticker=ticker)
+    if start is None:
+        params = {"range": "2y", "interval": "1d"}
+    else:
+        params = {"period1": int(start.timestamp()), "period2": int(time.time()), "interval": "1d"}
+    response = session.get(url, params=params, headers=HTTP_HEADERS, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    result = response.json()["chart"]["result"][0]
+
+    # タイムスタンプは取引所の現地時間に直してから日付に丸める
+    offset = result["meta"].get("gmtoffset", 0)
+    index = pd.to_datetime(np.asarray(result.get("timestamp", []), dtype=np.int64) + offset, unit="s").normalize()
+    indicators = result["indicators"]
+    if "adjclose" in indicators:
+        closes = indicators["adjclose"][0].get("adjclose", [])
+    else:
+        closes = indicators["quote"][0].get("close", [])
+    series = pd.Series(closes, index=index, name=ticker, dtype=float)
+    return series[~series.index.duplicated(keep="last")]
+
+def fetch_prices(tickers, start=None):
+    import requests
+
+    # 銘柄ごとのリクエストを並列に発行する (待ち時間はほぼ通信なので)
+    session = get_session()
+    try:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            series = list(executor.map(lambda t: fetch_close(session, t, start), tickers))
+    except requests.exceptions.RequestException as e:
+        print(f"Error: Failed to fetch market data: {e}")
+        sys.exit(1)
+    return pd.concat(series, axis=1).sort_index()
+
+def load_cached_prices(tickers):
+    if not os.path.exists(CACHE_PATH):
+        return None
+    try:
+        cached = pd.read_parquet(CACHE_PATH)
+    except Exception as e:
+        print(f"Warning: Failed to read price cache ({e}). Refetching.")
+        return None
+    if set(cached.columns) != set(tickers) or cached.empty:
+        return None
+    return cached
+
+def fill_missing(values):
+    """
+    欠損値を直前の値で埋め (ffill)、先頭の欠損は最初の有効値で埋める (bfill)。
+    """
+    rows = np.arange(values.shape[0])[:, None]
+    cols = np.arange(values.shape[1])
+    missing = np.isnan(values)
+
+    idx = np.where(missing, 0, rows)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = values[idx, cols]
+
+    first_valid = np.argmax(~missing, axis=0)
+    leading = rows < first_valid
+    filled[leading] = np.broadcast_to(values[first_valid, cols], filled.shape)[leading]
+    return filled
+
 def get_market_data():
-    tickers = [s["code"] for s in SECTORS]
+    tickers = _SECTOR_CODES
     print(f"Fetching data for {len(tickers)} sectors...")
-    # 修正: threads=False を追加してDBロックを回避
-    df = yf.download(tickers, period="2y", interval="1d", progress=False, threads=False)['Close']
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    df = df.ffill().bfill()
+
+    # キャッシュがあれば差分 (数日分の重なりを含む) だけ取得する
+    df = None
+    cached = load_cached_prices(tickers)
+    if cached is not None:
+        start = cached.index[-1] - timedelta(days=CACHE_OVERLAP_DAYS)
+        new = fetch_prices(tickers, start)
+        # 最終日は場中の値の可能性があるので比較から外す
+        common = new.index.intersection(cached.index[:-1])
+        if np.allclose(new.loc[common, tickers], cached.loc[common, tickers], rtol=1e-6, equal_nan=True):
+            print(f"Using cached prices until {cached.index[-1].strftime('%Y-%m-%d')}")
+            df = pd.concat([cached[cached.index < new.index[0]], new]) if len(new) else cached
+        else:
+            # 分配落ち等で過去の調整後終値が変わった場合は全期間を取り直す
+            print("Cached prices are stale. Refetching full history.")
+    if df is None:
+        df = fetch_prices(tickers)
+
+    # 列の並びを SECTORS の順にそろえる (取得できなかった銘柄は NaN 列になる)
+    df = df.reindex(columns=tickers)
+    df = df[df.index > df.index[-1] - pd.DateOffset(years=2)]
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    df.to_parquet(CACHE_PATH, compression="zstd")
+
+    df = pd.DataFrame(fill_missing(df.to_numpy()), index=df.index, columns=df.columns)
     last_date = df.index[-1]
     print(f"Latest data date: {last_date.strftime('%Y-%m-%d')}")
     return df
 
 def clock_to_rad(clock_hour):
     degree = 90 - (clock_hour * 30)
-    return math.radians(degree)
-
-def calculate_vector(df, target_date):
-    data_until = df[df.index <= target_date]
-    if len(data_until) < 200:
-        return None, None
-    current_prices = data_until.iloc[-1]
-    ma200 = data_until.iloc[-200:].mean()
-    deviations = (current_prices - ma200) / ma200 * 100
-    
-    total_x = 0
-    total_y = 0
-    for sector in SECTORS:
-        code = sector["code"]
-        if code not in deviations: continue
-        strength = deviations[code]
-        rad = clock_to_rad(sector["clock"])
-        x = strength * math.cos(rad)
-        y = strength * math.sin(rad)
-        total_x += x
-        total_y += y
-        
-    scale_factor = 4.0 
-    return total_x / scale_factor, total_y / scale_factor
+    return np.radians(degree)
+
+# 各セクターの方向ベクトル (定数なので読み込み時に一度だけ計算)
+_RADS = clock_to_rad(_SECTOR_CLOCKS)
+_COS = np.cos(_RADS)
+_SIN = np.sin(_RADS)
+
+def rolling_mean(values, window):
+    """
+    累積和の差分で移動平均を一括計算する (先頭 window-1 行は NaN)。
+    """
+    csum = np.cumsum(values, axis=0)
+    csum = np.concatenate([np.zeros((1,) + values.shape[1:]), csum])
+    result = np.full(values.shape, np.nan)
+    result[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return result
+
+def calculate_vectors(df):
+    """
+    全営業日の重心座標を一括で計算する。
+    200日分のデータが揃わない日は NaN になる。
+    """
+    prices = df.reindex(columns=_SECTOR_CODES).to_numpy()
+    ma200 = rolling_mean(prices, 200)
+    deviations = (prices - ma200) / ma200 * 100
+
+    scale_factor = 4.0
+    return deviations @ _COS / scale_factor, deviations @ _SIN / scale_factor
 
 # ==========================================
 # 3. HTML生成 (GitHub Pages用)
 # ==========================================
 
+# チャートページのテンプレートと描画スクリプト (読み込み時に一度だけ読み込む)
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _read_asset(name):
+    with open(os.path.join(SRC_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+def minify_css(css):
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+    return re.sub(r"\s*([{};:,])\s*", r"\1", css).strip()
+
+def minify_js(js):
+    """コメント・インデントを除く (rjsmin が無ければそのまま返す)。"""
+    if rjsmin is not None:
+        return rjsmin.jsmin(js)
+    return js
+
+def minify_html(html):
+    """
+    テンプレート用の簡易圧縮。<style> を圧縮し、タグ間・連続する空白を詰める。
+    (// コメントを含む JS には使えないので、描画スクリプトを埋め込む前に適用する)
+    """
+    html = re.sub(r"<style>(.*?)</style>",
+                  lambda m: "<style>" + minify_css(m.group(1)) + "</style>",
+                  html, flags=re.S)
+    html = re.sub(r">\s+<", "><", html)
+    return re.sub(r"\s+", " ", html).strip()
+
+# 描画スクリプトは固定なので先に埋め込み、実行時はデータの差し込みだけを行う
+CHART_JS = minify_js(_read_asset("chart.js"))
+CHART_TEMPLATE = minify_html(_read_asset("chart_template.html")).replace("__CHART_JS__", CHART_JS)
+
 def create_standalone_html(history_points, current_point, last_date_str):
     """
     GitHub Pagesで表示するためのHTML。
     """
-    history_json = json.dumps(history_points)
-    current_json = json.dumps([current_point])
+    history_json = dumps_json(history_points)
+    current_json = dumps_json([current_point])
+    # 軌跡の各線分の色 (古いほど薄く)。描画のたびに計算しないよう先に求めておく
+    count = len(history_points)
+    seg_colors = [f"rgba(80,80,80,{0.1 + 0.9 * i / count:.3f})" for i in range(count)]
     
-    html = f"""<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sector Cycle Chart</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        body {{ margin: 0; padding: 0; display: flex; justify-content: center; align-items: center; height: 100vh; background-color: #fff; }}
-        .chart-container {{ position: relative; width: 100vw; max-width: 600px; aspect-ratio: 1; }}
-        canvas {{ width: 100% !important; height: 100% !important; }}
-    </style>
-</head>
-<body>
-    <div class="chart-container">
-        <canvas id="sectorCycleChart"></canvas>
-    </div>
-    <script>
-    document.addEventListener("DOMContentLoaded", function() {{
-        var ctx = document.getElementById('sectorCycleChart');
-        
-        // 四隅に表示するセクターリスト
-        const sectorLabels = {{
-            NW: ["電機・精密", "情報通信", "建設・資材"],
-            NE: ["自動車", "機械", "商社・卸売"],
-            SE: ["銀行", "金融(除)", "エネルギー"],
-            SW: ["医薬品", "食品", "小売"]
-        }};
-
-        var bgPlugin = {{
-            id: 'bgPlugin',
-            beforeDraw: function(chart) {{
-                var ctx = chart.ctx;
-                var ca = chart.chartArea;
-                var x = chart.scales.x;
-                var y = chart.scales.y;
-                var midX = x.getPixelForValue(0);
-                var midY = y.getPixelForValue(0);
-                
-                ctx.save();
-                
-                // --- 背景色の描画 ---
-                // 北西 (回復): 芽吹き、若草色/シアン系
-                ctx.fillStyle = 'rgba(225, 250, 240, 0.5)';
-                ctx.fillRect(ca.left, ca.top, midX - ca.left, midY - ca.top);
-                
-                // 北東 (好況): 過熱、赤/オレンジ系
-                ctx.fillStyle = 'rgba(255, 235, 235, 0.5)';
-                ctx.fillRect(midX, ca.top, ca.left + ca.width - midX, midY - ca.top);
-                
-                // 南東 (後退): 警戒、黄色/アンバー系
-                ctx.fillStyle = 'rgba(255, 252, 230, 0.5)';
-                ctx.fillRect(midX, midY, ca.left + ca.width - midX, ca.top + ca.height - midY);
-                
-                // 南西 (不況): 冷え込み、青紫/グレー系
-                ctx.fillStyle = 'rgba(235, 235, 250, 0.5)';
-                ctx.fillRect(ca.left, midY, midX - ca.left, ca.top + ca.height - midY);
-                
-                // --- 十字線の描画 (少し濃く) ---
-                ctx.strokeStyle = 'rgba(0,0,0,0.2)';
-                ctx.lineWidth = 1;
-                ctx.beginPath();
-                ctx.moveTo(midX, ca.top); ctx.lineTo(midX, ca.bottom);
-                ctx.moveTo(ca.left, midY); ctx.lineTo(ca.right, midY);
-                ctx.stroke();
-
-                // --- テキスト描画設定 ---
-                ctx.textAlign = 'center';
-                ctx.textBaseline = 'middle';
-                
-                // エリア名 (中央寄り)
-                ctx.font = 'bold 16px sans-serif';
-                ctx.fillStyle = 'rgba(0,0,0,0.4)';
-                ctx.fillText('回復期', (ca.left + midX)/2, (ca.top + midY)/2);
-                ctx.fillText('好況期', (midX + ca.right)/2, (ca.top + midY)/2);
-                ctx.fillText('後退期', (midX + ca.right)/2, (midY + ca.bottom)/2);
-                ctx.fillText('不況期', (ca.left + midX)/2, (midY + ca.bottom)/2);
-
-                // --- 四隅の業種名描画 ---
-                ctx.font = '10px sans-serif';
-                ctx.fillStyle = 'rgba(0,0,0,0.5)';
-                var pad = 10;
-                var lineHeight = 12;
-
-                // NW (左上)
-                ctx.textAlign = 'left';
-                ctx.textBaseline = 'top';
-                sectorLabels.NW.forEach((text, i) => {{
-                    ctx.fillText(text, ca.left + pad, ca.top + pad + (i * lineHeight));
-                }});
-
-                // NE (右上)
-                ctx.textAlign = 'right';
-                sectorLabels.NE.forEach((text, i) => {{
-                    ctx.fillText(text, ca.right - pad, ca.top + pad + (i * lineHeight));
-                }});
-
-                // SE (右下)
-                ctx.textAlign = 'right';
-                ctx.textBaseline = 'bottom';
-                sectorLabels.SE.slice().reverse().forEach((text, i) => {{
-                    ctx.fillText(text, ca.right - pad, ca.bottom - pad - (i * lineHeight));
-                }});
-
-                // SW (左下)
-                ctx.textAlign = 'left';
-                ctx.textBaseline = 'bottom';
-                sectorLabels.SW.slice().reverse().forEach((text, i) => {{
-                    ctx.fillText(text, ca.left + pad, ca.bottom - pad - (i * lineHeight));
-                }});
-
-                ctx.restore();
-            }}
-        }};
-
-        new Chart(ctx, {{
-            type: 'scatter',
-            data: {{
-                datasets: [
-                    {{
-                        // 軌跡
-                        label: '軌跡',
-                        data: {history_json},
-                        borderWidth: 2,
-                        pointRadius: 0,
-                        showLine: true,
-                        segment: {{
-                            borderColor: function(ctx) {{
-                                var count = ctx.chart.data.datasets[0].data.length;
-                                var val = ctx.p1DataIndex / count;
-                                var alpha = 0.1 + (0.9 * val);
-                                return 'rgba(80, 80, 80, ' + alpha + ')';
-                            }}
-                        }},
-                        order: 2
-                    }},
-                    {{
-                        // 現在地点
-                        label: '現在',
-                        data: {current_json},
-                        backgroundColor: 'rgba(255, 0, 0, 1)',
-                        borderColor: '#fff',
-                        borderWidth: 2,
-                        pointRadius: 8,
-                        pointHoverRadius: 10,
-                        order: 1
-                    }}
-                ]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                scales: {{
-                    x: {{ 
-                        min: -25, max: 25,
-                        grid: {{
-                            display: true, // グリッド表示ON
-                            color: 'rgba(0, 0, 0, 0.05)', // 薄いグレー
-                            drawTicks: false
-                        }}, 
-                        ticks: {{display: false}} 
-                    }},
-                    y: {{ 
-                        min: -25, max: 25,
-                        grid: {{
-                            display: true, // グリッド表示ON
-                            color: 'rgba(0, 0, 0, 0.05)', // 薄いグレー
-                            drawTicks: false
-                        }}, 
-                        ticks: {{display: false}} 
-                    }}
-                }},
-                plugins: {{ legend: {{display: false}}, tooltip: {{enabled: false}} }}
-            }},
-            plugins: [bgPlugin]
-        }});
-    }});
-    </script>
-</body>
-</html>"""
+    html = (CHART_TEMPLATE
+            .replace("__HISTORY_JSON__", history_json)
+            .replace("__CURRENT_JSON__", current_json)
+            .replace("__SEG_COLORS__", dumps_json(seg_colors)))
     return html
 
-def generate_wp_content(config, last_date_str, current_phase):
-    """WordPress用のHTML (UI改善版)"""
-    pages_url = config.get("GITHUB_PAGES_URL", "#")
-    timestamp = datetime.now().strftime('%Y%m%d%H%M')
-    iframe_src = f"{pages_url}index.html?v={timestamp}"
-
-    style_details = """
+# WordPress 用HTMLのテンプレート
+WP_STYLE_DETAILS = """
     border: 1px solid #ddd;
     border-radius: 4px;
     padding: 10px;
     background-color: #f9f9f9;
     cursor: pointer;
     """
-    
-    style_summary = """
+
+WP_STYLE_SUMMARY = """
     font-weight: bold;
     color: #333;
     outline: none;
     """
 
-    wp_html = f"""
+WP_TEMPLATE = """
     <h3>日本市場 セクターローテーション  {last_date_str}</h3>
     <p>現在の重心は<strong>【{current_phase}】</strong>エリアにあります。<br>
     代表的な12業種の株価モメンタムを解析し、過去365日分の軌跡で景気の循環を描画しています。<br>
@@ -359,88 +378,140 @@ def generate_wp_content(config, last_date_str, current_phase):
 
         <h4 style="font-size: 1.1em; border-bottom: 2px solid #eee; padding-bottom: 5px; margin-top: 20px;">2. 除外セクター (5業種)</h4>
         <p>ノイズを排除するため、以下は計算に含めていません。</p>
-        {EXCLUSION_HTML}
+        {exclusion_html}
 
         <h4 style="font-size: 1.1em; border-bottom: 2px solid #eee; padding-bottom: 5px; margin-top: 20px;">3. 計算ロジック</h4>
         <p>各業種の「200日移動平均線からの乖離率」を物理的な『重さ』と見なし、それらが円周上で綱引きをした結果（重心）を表示しています。</p>
     </div>
     </details>
     """
-    return wp_html
+
+def generate_wp_content(config, last_date_str, current_phase, cache_token):
+    """
+    WordPress用のHTML (UI改善版)
+    cache_token はチャートの内容が変わった時だけ変わる値にする (iframe のキャッシュ対策)。
+    """
+    pages_url = config.get("GITHUB_PAGES_URL", "#")
+    iframe_src = f"{pages_url}index.html?v={cache_token}"
+
+    return WP_TEMPLATE.format_map({
+        "last_date_str": last_date_str,
+        "current_phase": current_phase,
+        "iframe_src": iframe_src,
+        "style_details": WP_STYLE_DETAILS,
+        "style_summary": WP_STYLE_SUMMARY,
+        "exclusion_html": EXCLUSION_HTML,
+    })
 
 # ==========================================
 # 4. メイン処理
 # ==========================================
 
+def write_atomic(path, text):
+    """
+    同じディレクトリの一時ファイルに書いてから rename で置き換える。
+    読み手からは常に旧内容か新内容のどちらかが見える。
+    """
+    data = text.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp.")
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        # mkstemp は 0600 で作るので、通常のファイルと同じ権限に戻す
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_chart_page(chart_html):
+    output_dir = "public"
+    os.makedirs(output_dir, exist_ok=True)
+    write_atomic(os.path.join(output_dir, "index.html"), chart_html)
+    print(f"Generated public/index.html")
+
 def main():
+    import requests
+
     config = load_secrets()
     df = get_market_data()
     latest_date = df.index[-1]
     last_date_str = latest_date.strftime('%Y年%m月%d日')
     
-    # 軌跡計算 (365日前から10日刻み)
-    history_points = []
-    end_date = latest_date
-    start_date = end_date - timedelta(days=365)
-    dates = pd.date_range(start=start_date, end=end_date, freq='10D')
-    
-    for d in dates:
-        if d not in df.index:
-            past_matches = df.index[df.index <= d]
-            if len(past_matches) == 0: continue
-            valid_date = past_matches[-1]
-        else:
-            valid_date = d  
-        x, y = calculate_vector(df, valid_date)
-        if x is not None:
-            history_points.append({"x": round(x, 2), "y": round(y, 2)})
+    # 軌跡計算 (365日前から10営業日刻み)
+    # 株価データ自体の営業日を間引いて使うので、日付の生成や丸めは不要
+    xs, ys = calculate_vectors(df)
+
+    start = df.index.searchsorted(latest_date - timedelta(days=365))
+    # 最終行は現在地として後で追加するので、ここでは含めない (同じ点の重複を防ぐ)
+    positions = np.arange(start, len(df) - 1, 10)
+    points = np.column_stack([xs[positions], ys[positions]])
+    points = points[~np.isnan(points[:, 0])]
+    np.round(points, 2, out=points)
+    # 点は [x, y] の組で持つ ({"x":..,"y":..} より JSON が短い)
+    history_points = points.tolist()
             
     # 現在地計算
-    curr_x, curr_y = calculate_vector(df, latest_date)
-    if curr_x is None:
+    curr_x, curr_y = float(xs[-1]), float(ys[-1])
+    if np.isnan(curr_x):
         print("Error: Calculation failed.")
         return
 
-    current_point = {"x": round(curr_x, 2), "y": round(curr_y, 2)}
+    current_point = [round(curr_x, 2), round(curr_y, 2)]
     
     # ★修正ポイント: 現在地を軌跡の最後に追加してつなげる
     history_points.append(current_point)
 
     # フェーズ判定
-    current_phase = "不明"
-    c_x_sign = 1 if curr_x >= 0 else -1
-    c_y_sign = 1 if curr_y >= 0 else -1
-    for name, signs in PHASES.items():
-        if signs["x_sign"] == c_x_sign and signs["y_sign"] == c_y_sign:
-            current_phase = name
-            break
-            
+    current_phase = _PHASE_TABLE[2 * (curr_y >= 0) + (curr_x >= 0)]
+
     print(f"Current Phase: {current_phase}")
 
     # GitHub Pages用HTML生成
     chart_html = create_standalone_html(history_points, current_point, last_date_str)
-    
-    output_dir = "public"
-    os.makedirs(output_dir, exist_ok=True)
-    with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as f:
-        f.write(chart_html)
-    print(f"Generated public/index.html")
+
+    # チャートが前回の反映時から変わっていなければ WordPress は更新しない
+    chart_hash = hashlib.blake2b(chart_html.encode("utf-8"), digest_size=16).hexdigest()
+    if os.path.exists(CHART_HASH_PATH):
+        with open(CHART_HASH_PATH, encoding="utf-8") as f:
+            if f.read().strip() == chart_hash:
+                write_chart_page(chart_html)
+                print("No change in chart; skipping WordPress update.")
+                return
 
     # WordPress更新
-    wp_content = generate_wp_content(config, last_date_str, current_phase)
+    # iframe の URL はチャートの内容が変わった時だけ変える (同じ入力なら出力も同一になる)
+    wp_content = generate_wp_content(config, last_date_str, current_phase, chart_hash)
     
     wp_url = f"{config['WP_URL']}/wp-json/wp/v2/pages/{config['WP_PAGE_ID']}"
     auth = (config['WP_USER'], config['WP_PASSWORD'])
-    payload = {'content': wp_content}
+    # 本文のJSONは一度だけエンコードし、そのままリクエストボディとして送る
+    body = dumps_json({'content': wp_content}).encode("utf-8")
+    headers = {'Content-Type': 'application/json; charset=utf-8'}
     
     print(f"Updating WordPress Page ID: {config['WP_PAGE_ID']}...")
-    try:
-        response = requests.post(wp_url, json=payload, auth=auth)
-        response.raise_for_status()
-        print("Success! WordPress updated.")
-    except requests.exceptions.RequestException as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+    # 送信の応答を待つ間に index.html を書き出す (互いに独立した I/O なので重ねる)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(
+            get_session().post, wp_url,
+            data=body, headers=headers, auth=auth, timeout=HTTP_TIMEOUT,
+        )
+        write_chart_page(chart_html)
+        try:
+            response = future.result()
+            response.raise_for_status()
+            print("Success! WordPress updated.")
+        except requests.exceptions.RequestException as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    os.makedirs(os.path.dirname(CHART_HASH_PATH), exist_ok=True)
+    write_atomic(CHART_HASH_PATH, chart_hash)
 
 if __name__ == "__main__":
     main()